@@ -1,35 +1,244 @@
+import time
+
+_import_started = time.perf_counter()
+
 import sys
 import os
 import json
 import logging
 import threading
+import getpass
+import itertools
+import functools
+import html
 from datetime import datetime
 from pathlib import Path
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from PyQt6.QtCore import QUrl, Qt, QSize, QStandardPaths
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, quote
+from PyQt6.QtCore import (QUrl, Qt, QSize, QStandardPaths, QTimer, QCoreApplication,
+                          QObject, pyqtSignal)
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLineEdit, QPushButton, QTabWidget,
-                             QToolBar, QStatusBar, QMessageBox, QFileDialog)
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+                             QToolBar, QStatusBar)
 from PyQt6.QtGui import QIcon, QKeySequence, QFont, QAction, QColor
 from PyQt6.QtCore import QDir
+from downloads import DownloadManager
+import reader
+from thumbnails import ThumbnailCache, ThumbnailService
+from log_setup import setup_logging, next_request_id, ACCESS_LOGGER
+from tab_search import TabSearchIndex, FindInTabsDialog
+
+# QtWebEngine поднимает Chromium и занимает большую часть времени запуска,
+# поэтому модули импортируются лениво в load_web_engine() - после того,
+# как окно уже отрисовано
+QWebEngineView = None
+QWebEngineProfile = None
+QWebEnginePage = None
+CustomWebEnginePage = None
+
+
+class StartupProbe:
+    """Замеры времени запуска: импорт, первая отрисовка, первая страница.
+
+    ECLIPSE_STARTUP_PROBE=1 печатает итог в stderr одной JSON-строкой,
+    ECLIPSE_STARTUP_PROBE=exit дополнительно закрывает приложение после
+    загрузки первой страницы. ECLIPSE_STARTUP_BUDGET_MS задает лимит на
+    first_page_loaded - при превышении код выхода 1 (для проверок в CI).
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self.marks = {}
+        self.reported = False
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = round((time.perf_counter() - self.started) * 1000, 1)
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        logging.info(f"Startup timings (ms): {json.dumps(self.marks)}")
+
+        mode = os.environ.get("ECLIPSE_STARTUP_PROBE")
+        if not mode:
+            return
+        print(json.dumps(self.marks), file=sys.stderr, flush=True)
+
+        exit_code = 0
+        budget = os.environ.get("ECLIPSE_STARTUP_BUDGET_MS")
+        if budget and self.marks.get("first_page_loaded", 0) > float(budget):
+            exit_code = 1
+        if mode == "exit" or exit_code:
+            QCoreApplication.exit(exit_code)
+
+
+startup_probe = StartupProbe(_import_started)
+startup_probe.mark("imports_done")
+
+
+def load_web_engine():
+    global QWebEngineView, QWebEngineProfile, QWebEnginePage, CustomWebEnginePage
+    if CustomWebEnginePage is not None:
+        return
+
+    from PyQt6.QtWebEngineWidgets import QWebEngineView
+    from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+
+    class _CustomWebEnginePage(QWebEnginePage):
+        def __init__(self, profile=None, parent=None):
+            super().__init__(profile, parent) if profile else super().__init__(parent)
+            self.main_window = None
+
+        def set_main_window(self, main_window):
+            self.main_window = main_window
+
+        def createWindow(self, type):
+            if self.main_window:
+                self.main_window.add_new_tab()
+                return self.main_window.current_tab().browser.page()
+            return super().createWindow(type)
+
+        def acceptNavigationRequest(self, url, type, is_main_frame):
+            # В lite-режиме переходы по ссылкам тоже идут через /reader,
+            # а не только ввод в адресной строке (родитель страницы - BrowserTab)
+            tab = self.parent()
+            if (is_main_frame and type == QWebEnginePage.NavigationType.NavigationTypeLinkClicked
+                    and getattr(tab, "lite_mode", False)):
+                target = tab.lite_url(url.toString())
+                if target != url.toString():
+                    # Новая навигация - после выхода из обработчика текущей
+                    QTimer.singleShot(0, lambda: self.setUrl(QUrl(target)))
+                    return False
+            return super().acceptNavigationRequest(url, type, is_main_frame)
+
+    CustomWebEnginePage = _CustomWebEnginePage
+    startup_probe.mark("web_engine_loaded")
+
+
+LOCAL_ROOT = "http://localhost:8000"
+READER_PATH = "/reader"
+
+
+def reader_url(url):
+    return f"{LOCAL_ROOT}{READER_PATH}?url={quote(url, safe='')}"
+
+
+access_log = logging.getLogger(ACCESS_LOGGER)
+
 
 class LocalHTTPRequestHandler(SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
+        self.private_response = False
+        self.request_id = None
         super().__init__(*args, directory=str(paths.app_data), **kwargs)
 
+    def handle_one_request(self):
+        self.request_id = next_request_id()
+        self.request_started = time.perf_counter()
+        super().handle_one_request()
+
+    # Вместо строки в stderr на каждый запрос - структурированная запись
+    # в access.log (с сэмплированием, см. log_setup)
+    def log_request(self, code="-", size="-"):
+        access_log.info(f'"{self.requestline}" {code} {size}', extra={
+            "request_id": self.request_id,
+            "method": self.command,
+            "path": self.path,
+            "status": int(code) if isinstance(code, int) else None,
+            "client": self.client_address[0],
+            "duration_ms": round((time.perf_counter() - self.request_started) * 1000, 2)
+        })
+
+    def log_error(self, format, *args):
+        access_log.warning(format % args, extra={"request_id": self.request_id})
+
+    def log_message(self, format, *args):
+        access_log.info(format % args, extra={"request_id": self.request_id})
+
     def end_headers(self):
         # Разрешаем загрузку ресурсов
-        self.send_header('Access-Control-Allow-Origin', '*')
+        if not self.private_response:
+            self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Cross-Origin-Embedder-Policy', 'require-corp')
         self.send_header('Cross-Origin-Opener-Policy', 'same-origin')
         super().end_headers()
 
+    def do_GET(self):
+        if self.path.startswith(READER_PATH + "?"):
+            self.send_reader_page()
+        elif self.path == "/thumbnails.json":
+            if self.allow_private():
+                self.send_thumbnail_index()
+        elif self.is_thumbnail_file():
+            # Превью - снимки посещенных страниц, в т.ч. с авторизацией
+            if self.allow_private():
+                super().do_GET()
+        else:
+            super().do_GET()
+
+    def allow_private(self):
+        # Приватные ответы (lite-страницы, превью и их список) отдаем только
+        # самому браузеру: адресная строка или страницы с localhost.
+        # Иначе любой сайт мог бы читать их через fetch()
+        self.private_response = True
+        if self.headers.get("Sec-Fetch-Site", "none") not in ("none", "same-origin"):
+            self.send_error(403)
+            return False
+        return True
+
+    def is_thumbnail_file(self):
+        path = os.path.normcase(os.path.realpath(self.translate_path(self.path)))
+        root = os.path.normcase(os.path.realpath(paths.thumbnails))
+        return path == root or path.startswith(root + os.sep)
+
+    def send_thumbnail_index(self):
+        # Превью лежат в paths.thumbnails и раздаются как обычные файлы
+        prefix = "/" + paths.thumbnails.relative_to(paths.app_data).as_posix()
+        entries = [{"url": url, "src": f"{prefix}/{name}"}
+                   for url, name in thumbnail_cache.snapshot()]
+        data = json.dumps(entries).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_reader_page(self):
+        # Иначе любой сайт мог бы читать через localhost произвольные URL
+        if not self.allow_private():
+            return
+
+        url = parse_qs(urlsplit(self.path).query).get("url", [""])[0]
+        try:
+            body = reader.render(url, READER_PATH)
+            status = 200
+        except Exception as e:
+            logging.error(f"Lite mode failed for {url}: {e}",
+                          extra={"request_id": self.request_id, "url": url})
+            body = (f"<!DOCTYPE html><html><body>Lite mode could not load "
+                    f"{html.escape(url)}: {html.escape(str(e))}</body></html>")
+            status = 502
+
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        # Скрипты исходной страницы вырезаны; CSP - на случай, если что-то
+        # проскочит через разбор HTML
+        self.send_header("Content-Security-Policy", "script-src 'none'; object-src 'none'")
+        self.end_headers()
+        self.wfile.write(data)
+
 # Добавьте эту функцию
 def run_local_server():
     server_address = ('localhost', 8000)
-    httpd = HTTPServer(server_address, LocalHTTPRequestHandler)
+    # Потоковый сервер: загрузка страницы для lite-режима не должна
+    # блокировать отдачу домашней страницы и ресурсов
+    httpd = ThreadingHTTPServer(server_address, LocalHTTPRequestHandler)
     logging.info("Starting local server at http://localhost:8000")
     httpd.serve_forever()
 
@@ -44,6 +253,7 @@ class BrowserPaths:
         self.profiles = self.app_data / "Profiles"
         self.extensions = self.app_data / "Extensions"
         self.themes = self.app_data / "Themes"
+        self.thumbnails = self.app_data / "Thumbnails"
 
         self.create_dirs()
 
@@ -54,6 +264,7 @@ class BrowserPaths:
         self.profiles.mkdir(exist_ok=True)
         self.extensions.mkdir(exist_ok=True)
         self.themes.mkdir(exist_ok=True)
+        self.thumbnails.mkdir(exist_ok=True)
 
     @property
     def settings_file(self):
@@ -67,6 +278,397 @@ class BrowserPaths:
     def history_file(self):
         return self.app_data / "history.log"
 
+    @property
+    def downloads_file(self):
+        return self.app_data / "downloads.json"
+
+    @property
+    def downloads_dir(self):
+        return Path(QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.DownloadLocation))
+
+
+class TabRegistry:
+    """Вкладки по стабильным ID + объединение обновлений UI.
+
+    Индексы QTabWidget сдвигаются после закрытия вкладки, поэтому сигналы
+    страниц адресуются по tab_id. Заголовки, прогресс и статус копятся в
+    словарях и применяются не чаще одного раза за кадр (FRAME_MS), так что
+    сотни одновременно грузящихся вкладок не перерисовывают UI на каждый тик.
+    """
+
+    FRAME_MS = 16
+    # ID уникальны во всем процессе - по ним вкладки ищутся и между окнами
+    ids = itertools.count(1)
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.tabs = {}
+
+        self.pending_titles = {}
+        self.pending_progress = {}
+        self.pending_status = {}
+
+        self.flush_timer = QTimer(main_window)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.FRAME_MS)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def register(self, tab):
+        tab_id = next(self.ids)
+        self.tabs[tab_id] = tab
+        tab.tab_id = tab_id
+        return tab_id
+
+    def unregister(self, tab_id):
+        self.tabs.pop(tab_id, None)
+        self.pending_titles.pop(tab_id, None)
+        self.pending_progress.pop(tab_id, None)
+        self.pending_status.pop(tab_id, None)
+
+    def get(self, tab_id):
+        return self.tabs.get(tab_id)
+
+    def __len__(self):
+        return len(self.tabs)
+
+    def __iter__(self):
+        return iter(self.tabs.values())
+
+    def queue_title(self, tab_id, title):
+        self.pending_titles[tab_id] = title
+        self.schedule_flush()
+
+    def queue_progress(self, tab_id, progress):
+        self.pending_progress[tab_id] = progress
+        self.schedule_flush()
+
+    def queue_status(self, tab_id, message):
+        self.pending_status[tab_id] = message
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        titles, self.pending_titles = self.pending_titles, {}
+        progress, self.pending_progress = self.pending_progress, {}
+        status, self.pending_status = self.pending_status, {}
+
+        window = self.main_window
+        current = window.current_tab()
+        current_id = getattr(current, "tab_id", None)
+
+        # Индексы вкладок - один проход за кадр, а не indexOf на каждый заголовок
+        indexes = {}
+        if titles:
+            indexes = {window.tabs.widget(i): i for i in range(window.tabs.count())}
+
+        for tab_id, title in titles.items():
+            tab = self.tabs.get(tab_id)
+            if tab is None:
+                continue
+            tab.title = title
+            window.update_tab_title(indexes.get(tab, -1), title)
+            if tab_id == current_id:
+                window.setWindowTitle(f"{title} - EclipseBrowse")
+
+        # Статусная строка показывает только текущую вкладку
+        if current_id in progress:
+            value = progress[current_id]
+            if value < 100:
+                window.statusBar().showMessage(f"Loading... {value}%")
+            else:
+                window.statusBar().clearMessage()
+        if current_id in status:
+            window.statusBar().showMessage(status[current_id])
+
+
+# Загрузки крупнее этого порога (и с известным размером) отдаются
+# DownloadManager, который качает их несколькими соединениями с докачкой
+COOKIE_LOAD_DELAY_MS = 1000
+LARGE_DOWNLOAD_BYTES = 50 * 1024 * 1024
+
+DEFAULT_DOWNLOAD_SETTINGS = {
+    "max_concurrent": 3,
+    "segments": 4,
+    "bandwidth_limit": 0
+}
+
+
+class DownloadBridge(QObject):
+    # DownloadManager вызывает колбэк из рабочих потоков, сигнал
+    # доставляет обновление в GUI-поток
+    updated = pyqtSignal(object)
+
+
+class BrowserBackend(QObject):
+    """Общее для всех окон процесса: профиль, загрузки, список окон.
+
+    Локальный сервер и история уже глобальные, так что новое окно
+    открывается без повторной инициализации.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.windows = []
+        self.profile = None
+        self.downloads = None
+        # Копия cookie профиля: (имя, домен, путь) -> (значение, secure, истекает)
+        self.cookies = {}
+
+        self.thumbnails = ThumbnailService(
+            thumbnail_cache, self.is_loading, skip_prefixes=(LOCAL_ROOT,), parent=self)
+        self.thumbnails.saved.connect(self.on_thumbnail_saved)
+
+        self.tab_index = TabSearchIndex(parent=self)
+
+    def new_window(self, url=None):
+        window = EclipseBrowser(self, url)
+        self.windows.append(window)
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        return window
+
+    def open_urls(self, urls):
+        # Каждый URL - в своем окне; без URL - одно окно с домашней страницей
+        for url in urls or [None]:
+            self.new_window(url)
+
+    def window_closed(self, window):
+        if window in self.windows:
+            self.windows.remove(window)
+        # Вкладки закрытого окна больше не ищутся и не ждут превью
+        for tab in window.tab_registry:
+            self.thumbnails.discard(tab.tab_id)
+            self.tab_index.remove(tab.tab_id)
+        if not self.windows:
+            self.thumbnails.shutdown()
+            self.tab_index.shutdown()
+            if self.downloads:
+                # Незавершенные загрузки продолжатся при следующем запуске
+                self.downloads.shutdown()
+
+    def is_loading(self):
+        return any(tab.loading for window in self.windows for tab in window.tab_registry)
+
+    def on_thumbnail_saved(self, url, path):
+        # Превью во всплывающей подсказке вкладки
+        for window in self.windows:
+            for tab in window.tab_registry:
+                if tab.browser.url().toString() == url:
+                    window.tabs.setTabToolTip(
+                        window.tabs.indexOf(tab),
+                        f'<img src="{html.escape(path)}" width="240"><br>{html.escape(tab.title)}')
+
+    def activate_tab(self, tab_id, query=""):
+        for window in self.windows:
+            tab = window.tab_registry.get(tab_id)
+            if tab is None:
+                continue
+            window.tabs.setCurrentWidget(tab)
+            window.raise_()
+            window.activateWindow()
+            if query:
+                tab.browser.findText(query)
+            return
+
+    def active_window(self):
+        window = QApplication.activeWindow()
+        if window in self.windows:
+            return window
+        return self.windows[-1] if self.windows else None
+
+    def get_profile(self):
+        if self.profile is None:
+            load_web_engine()
+            self.profile = QWebEngineProfile("Default", self)
+            self.profile.setCachePath(str(paths.cache))
+            self.profile.setPersistentStoragePath(str(paths.profiles / "default"))
+            self.profile.setPersistentCookiesPolicy(
+                QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies)
+            self.profile.downloadRequested.connect(self.on_download_requested)
+
+            # Cookie нужны загрузкам, переданным в DownloadManager
+            cookie_store = self.profile.cookieStore()
+            cookie_store.cookieAdded.connect(self.on_cookie_added)
+            cookie_store.cookieRemoved.connect(self.on_cookie_removed)
+            cookie_store.loadAllCookies()
+        return self.profile
+
+    @staticmethod
+    def cookie_key(cookie):
+        return (bytes(cookie.name()).decode("latin-1"), cookie.domain().lower(),
+                cookie.path() or "/")
+
+    def on_cookie_added(self, cookie):
+        expires = None if cookie.isSessionCookie() else cookie.expirationDate().toSecsSinceEpoch()
+        self.cookies[self.cookie_key(cookie)] = (
+            bytes(cookie.value()).decode("latin-1"), cookie.isSecure(), expires)
+
+    def on_cookie_removed(self, cookie):
+        self.cookies.pop(self.cookie_key(cookie), None)
+
+    def cookie_header(self, url):
+        host = url.host().lower()
+        path = url.path() or "/"
+        secure = url.scheme() == "https"
+        now = time.time()
+        pairs = []
+        # Вызывается и из потоков загрузок - итерируем по копии
+        for (name, domain, cookie_path), (value, cookie_secure, expires) in list(self.cookies.items()):
+            if domain.startswith("."):
+                if host != domain[1:] and not host.endswith(domain):
+                    continue
+            elif host != domain:
+                continue
+            if path != cookie_path and not path.startswith(cookie_path.rstrip("/") + "/"):
+                continue
+            if (cookie_secure and not secure) or (expires is not None and expires < now):
+                continue
+            pairs.append(f"{name}={value}")
+        return "; ".join(pairs)
+
+    def setup_downloads(self, settings):
+        if self.downloads:
+            return
+        options = {**DEFAULT_DOWNLOAD_SETTINGS, **settings.get("downloads", {})}
+        self.download_bridge = DownloadBridge(self)
+        self.download_bridge.updated.connect(self.on_download_updated)
+        self.downloads = DownloadManager(
+            paths.downloads_file,
+            max_concurrent=options["max_concurrent"],
+            segments=options["segments"],
+            bandwidth_limit=options["bandwidth_limit"],
+            on_update=self.download_bridge.updated.emit,
+            cookie_header=lambda url: self.cookie_header(QUrl(url))
+        )
+        # Cookie сохраненных загрузок не хранятся: докачку начинаем, когда
+        # cookie store профиля (он загружается асинхронно) уже прочитан
+        self.get_profile()
+        QTimer.singleShot(COOKIE_LOAD_DELAY_MS, self.downloads.resume_pending)
+
+    def show_status(self, message, timeout=0):
+        window = self.active_window()
+        if window:
+            window.statusBar().showMessage(message, timeout)
+
+    def on_download_requested(self, download):
+        from PyQt6.QtWidgets import QFileDialog
+
+        suggested = paths.downloads_dir / download.downloadFileName()
+        path, _ = QFileDialog.getSaveFileName(
+            self.active_window(), "Save File", str(suggested))
+        if not path:
+            download.cancel()
+            return
+
+        url = download.url()
+        # Логин в URL DownloadManager не передаем - такие загрузки остаются у WebEngine
+        if (download.totalBytes() >= LARGE_DOWNLOAD_BYTES and url.scheme() in ("http", "https")
+                and not url.userName()):
+            referrer = None
+            page = download.page()
+            if page and page.url().scheme() in ("http", "https"):
+                referrer = page.url().toString(
+                    QUrl.UrlFormattingOption.RemoveUserInfo | QUrl.UrlFormattingOption.RemoveFragment)
+            download.cancel()
+            self.downloads.add(url.toString(), path, referrer, download.mimeType())
+            self.show_status(f"Downloading {Path(path).name}...")
+            return
+
+        download.setDownloadDirectory(str(Path(path).parent))
+        download.setDownloadFileName(Path(path).name)
+        download.isFinishedChanged.connect(
+            lambda: self.show_status(f"Downloaded {Path(path).name}", 5000))
+        download.accept()
+
+    def on_download_updated(self, download):
+        name = download.dest.name
+        if download.status == "running":
+            self.show_status(f"Downloading {name}... {download.progress}%")
+        elif download.status == "finished":
+            self.show_status(f"Downloaded {name}", 5000)
+        elif download.status == "failed":
+            self.show_status(f"Download failed: {name} ({download.error})", 5000)
+
+
+# Имя локального сокета, через который повторный запуск передает
+# URL уже работающему процессу
+INSTANCE_SERVER_NAME = f"EclipseBrowse-{getpass.getuser()}"
+
+
+def forward_to_running_instance(urls):
+    from PyQt6.QtNetwork import QLocalSocket
+
+    socket = QLocalSocket()
+    socket.connectToServer(INSTANCE_SERVER_NAME)
+    if not socket.waitForConnected(300):
+        return False
+
+    socket.write(json.dumps({"urls": urls}).encode("utf-8") + b"\n")
+    socket.waitForBytesWritten(1000)
+    socket.disconnectFromServer()
+    return True
+
+
+class InstanceServer(QObject):
+    """Принимает URL от повторных запусков: сигнал urls_received(urls).
+
+    Сокет занимается до запуска локального сервера и создания окон, а
+    сообщения обрабатываются уже в цикле событий.
+    """
+
+    urls_received = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        from PyQt6.QtNetwork import QLocalServer
+
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.on_new_connection)
+
+    def listen(self, urls):
+        """Занимает имя сокета. False - его успел занять параллельный запуск,
+        urls переданы ему."""
+        from PyQt6.QtNetwork import QLocalServer
+
+        if self.server.listen(INSTANCE_SERVER_NAME):
+            return True
+        # Между forward_to_running_instance() и listen() имя мог занять
+        # другой экземпляр - проверяем еще раз, прежде чем удалять сокет
+        if forward_to_running_instance(urls):
+            return False
+        # Никто не ответил - сокет остался от упавшего процесса
+        QLocalServer.removeServer(INSTANCE_SERVER_NAME)
+        if not self.server.listen(INSTANCE_SERVER_NAME):
+            logging.error(f"Instance server failed: {self.server.errorString()}")
+        return True
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            buffer = bytearray()
+            socket.readyRead.connect(
+                lambda socket=socket, buffer=buffer: self.on_ready_read(socket, buffer))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def on_ready_read(self, socket, buffer):
+        buffer += bytes(socket.readAll())
+        if b"\n" not in buffer:
+            return
+        socket.disconnectFromServer()
+        try:
+            urls = json.loads(buffer.split(b"\n", 1)[0].decode("utf-8"))["urls"]
+        except (ValueError, KeyError) as e:
+            logging.error(f"Bad instance message: {e}")
+            return
+
+        logging.info(f"Opening forwarded URLs: {urls}")
+        self.urls_received.emit(urls)
+
 
 class BrowserTab(QWidget):
     def __init__(self, profile, home_path, main_window, parent=None):
@@ -74,6 +676,10 @@ class BrowserTab(QWidget):
         self.profile = profile
         self.home_path = home_path
         self.main_window = main_window
+        self.tab_id = None
+        self.title = ""
+        self.loading = False
+        self.lite_mode = main_window.settings.get("lite_mode", False)
 
         # Создаем кастомную страницу с профилем
         self.page = CustomWebEnginePage(profile, self)
@@ -83,12 +689,6 @@ class BrowserTab(QWidget):
         self.browser.setPage(self.page)  # Используем нашу кастомную страницу
         self.browser.setUrl(QUrl("about:blank"))
 
-        # Настройки профиля
-        self.profile.setCachePath(str(paths.cache))
-        self.profile.setPersistentStoragePath(str(paths.profiles / "default"))
-        self.profile.setPersistentCookiesPolicy(
-            QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies)
-
         # Панель навигации
         self.setup_navbar()
 
@@ -112,6 +712,14 @@ class BrowserTab(QWidget):
         self.reload_btn = QPushButton(QIcon.fromTheme("view-refresh"), "")
         self.home_btn = QPushButton(QIcon.fromTheme("go-home"), "")
 
+        # Lite-режим: страница загружается и упрощается в Python, без
+        # скриптов и медиа
+        self.lite_btn = QPushButton("Lite")
+        self.lite_btn.setToolTip("Lite mode: text only, no scripts or media")
+        self.lite_btn.setCheckable(True)
+        self.lite_btn.setChecked(self.lite_mode)
+        self.lite_btn.setFixedSize(40, 32)
+
         # URL-бар
         self.url_bar = QLineEdit()
         self.url_bar.setPlaceholderText("Enter URL or search...")
@@ -124,16 +732,21 @@ class BrowserTab(QWidget):
             self.nav_bar.addWidget(btn)
 
         self.nav_bar.addWidget(self.url_bar)
+        self.nav_bar.addWidget(self.lite_btn)
 
     def connect_signals(self):
         self.back_btn.clicked.connect(self.browser.back)
         self.forward_btn.clicked.connect(self.browser.forward)
         self.reload_btn.clicked.connect(self.browser.reload)
         self.home_btn.clicked.connect(self.navigate_home)
+        self.lite_btn.toggled.connect(self.set_lite_mode)
         self.url_bar.returnPressed.connect(self.navigate_to_url)
         self.browser.urlChanged.connect(self.update_urlbar)
         self.browser.titleChanged.connect(self.update_title)
         self.browser.loadProgress.connect(self.update_progress)
+        self.browser.loadStarted.connect(self.on_load_started)
+        self.browser.loadFinished.connect(self.on_load_finished)
+        self.page.linkHovered.connect(self.update_status)
 
     # В классе BrowserTab метод navigate_to_url:
     def navigate_to_url(self):
@@ -142,6 +755,7 @@ class BrowserTab(QWidget):
             return
 
         log_history(url)
+        logging.info("Navigate", extra={"tab_id": self.tab_id, "url": url})
 
         # Обработка специальных URL
         if url.startswith("http://localhost:8000/search.html?q="):
@@ -153,73 +767,135 @@ class BrowserTab(QWidget):
             else:
                 url = f"http://localhost:8000/search.html?q={url.replace(' ', '+')}"
 
-        self.browser.setUrl(QUrl(url))
+        self.browser.setUrl(QUrl(self.lite_url(url)))
+
+    def lite_url(self, url):
+        if self.lite_mode and url.startswith(("http://", "https://")) \
+                and not url.startswith(LOCAL_ROOT):
+            return reader_url(url)
+        return url
+
+    def set_lite_mode(self, enabled):
+        self.lite_mode = enabled
+        # Перезагружаем текущую страницу в выбранном режиме; в адресной
+        # строке всегда исходный URL (см. update_urlbar)
+        url = self.url_bar.text().strip()
+        if url.startswith(("http://", "https://")) and not url.startswith(LOCAL_ROOT):
+            self.browser.setUrl(QUrl(self.lite_url(url)))
 
     def navigate_home(self):
         self.browser.setUrl(QUrl("http://localhost:8000/home_page.html"))
 
     def update_urlbar(self, q):
-        self.url_bar.setText(q.toString())
+        url = q.toString()
+        if url.startswith(LOCAL_ROOT + READER_PATH + "?"):
+            url = parse_qs(urlsplit(url).query).get("url", [url])[0]
+        self.url_bar.setText(url)
         self.url_bar.setCursorPosition(0)
 
     def update_title(self, title):
-        if hasattr(self.parent().parent(), "setWindowTitle"):
-            self.parent().parent().setWindowTitle(f"{title} - EclipseBrowse")
+        self.main_window.tab_registry.queue_title(self.tab_id, title)
 
     def update_progress(self, progress):
-        if hasattr(self.parent().parent(), "statusBar"):
-            if progress < 100:
-                self.parent().parent().statusBar().showMessage(f"Loading... {progress}%")
-            else:
-                self.parent().parent().statusBar().clearMessage()
-
-
+        self.main_window.tab_registry.queue_progress(self.tab_id, progress)
+
+    def on_load_started(self):
+        self.loading = True
+
+    def on_load_finished(self, ok):
+        self.loading = False
+        if ok:
+            self.main_window.backend.thumbnails.request(self)
+            # Текст страницы для поиска по всем вкладкам; при навигации
+            # запись вкладки в индексе заменяется
+            self.page.toPlainText(self.on_plain_text)
+        else:
+            logging.warning("Page load failed", extra={
+                "tab_id": self.tab_id, "url": self.browser.url().toString()})
 
-class CustomWebEnginePage(QWebEnginePage):
-    def __init__(self, profile=None, parent=None):
-        super().__init__(profile, parent) if profile else super().__init__(parent)
-        self.main_window = None
+    def on_plain_text(self, text):
+        self.main_window.backend.tab_index.update(
+            self.tab_id, self.browser.url().toString(), self.browser.title(), text)
 
-    def set_main_window(self, main_window):
-        self.main_window = main_window
+    def update_status(self, message):
+        self.main_window.tab_registry.queue_status(self.tab_id, message)
 
-    def createWindow(self, type):
-        if self.main_window:
-            self.main_window.add_new_tab()
-            return self.main_window.current_tab().browser.page()
-        return super().createWindow(type)
 
 class EclipseBrowser(QMainWindow):
-    def __init__(self):
+    def __init__(self, backend, url=None):
         super().__init__()
         self.paths = paths
+        self.backend = backend
+        self.initial_url = url
         self.setWindowTitle("EclipseBrowse")
         self.setGeometry(100, 100, 1200, 800)
         self.setMinimumSize(800, 600)
 
-        # Инициализация
+        # Инициализация: сначала только "оболочка" окна, WebEngine, меню
+        # и первая вкладка - в finish_startup() после первой отрисовки
+        self.startup_finished = False
+        self.first_paint = False
+        self.settings = {}
+        self.find_dialog = None
         self.setup_tabs()
-        self.statusBar().showMessage("Ready")
+        self.statusBar().showMessage("Starting...")
         self.create_actions()
         self.create_toolbar()
-        self.create_menus()
         self.load_settings()
 
-        # Первая вкладка
-        self.add_new_tab()
-
         icon_path = str(Path(__file__).parent / "assets" / "EclipseBrowseLogo.png")
         self.setWindowIcon(QIcon(icon_path))
 
+        # Страховка на случай, если окно так и не получит paintEvent
+        # (свернуто, offscreen-платформа)
+        QTimer.singleShot(500, self.finish_startup)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint:
+            self.first_paint = True
+            # В пробе отмечается только первое окно процесса
+            if "first_paint" not in startup_probe.marks:
+                startup_probe.mark("first_paint")
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        if self.startup_finished:
+            return
+        self.startup_finished = True
+
+        load_web_engine()
+        self.create_menus()
+        self.backend.setup_downloads(self.settings)
+
+        # Первая вкладка
+        tab = self.add_new_tab(self.initial_url)
+        # Привязываем обработчик к самой вкладке: к моменту загрузки текущей
+        # может стать другая (всплывающее окно, Ctrl+T)
+        self.first_load_handler = functools.partial(self.on_first_page_loaded, tab)
+        tab.browser.loadFinished.connect(self.first_load_handler)
+        self.statusBar().showMessage("Ready")
+
+    def on_first_page_loaded(self, tab, ok):
+        tab.browser.loadFinished.disconnect(self.first_load_handler)
+        startup_probe.mark("first_page_loaded")
+        startup_probe.report()
+
     def setup_tabs(self):
         self.tabs = QTabWidget()
         self.tabs.setDocumentMode(True)
         self.tabs.setTabsClosable(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
+        self.tabs.currentChanged.connect(self.on_current_tab_changed)
         self.setCentralWidget(self.tabs)
+        self.tab_registry = TabRegistry(self)
 
     def create_actions(self):
         # Файл
+        self.new_window_action = QAction("New Window", self)
+        self.new_window_action.setShortcut(QKeySequence.StandardKey.New)
+        self.new_window_action.triggered.connect(lambda: self.backend.new_window())
+
         self.new_tab_action = QAction("New Tab", self)
         self.new_tab_action.setShortcut(QKeySequence.StandardKey.AddTab)
         self.new_tab_action.triggered.connect(self.add_new_tab)
@@ -229,6 +905,10 @@ class EclipseBrowser(QMainWindow):
         self.close_tab_action.triggered.connect(
             lambda: self.close_tab(self.tabs.currentIndex()))
 
+        self.find_in_tabs_action = QAction("Find in All Tabs...", self)
+        self.find_in_tabs_action.setShortcut(QKeySequence("Ctrl+Shift+F"))
+        self.find_in_tabs_action.triggered.connect(self.show_find_in_tabs)
+
         self.quit_action = QAction("Exit", self)
         self.quit_action.setShortcut(QKeySequence.StandardKey.Quit)
         self.quit_action.triggered.connect(self.close)
@@ -272,8 +952,10 @@ class EclipseBrowser(QMainWindow):
 
         # Меню Файл
         file_menu = menubar.addMenu("&File")
+        file_menu.addAction(self.new_window_action)
         file_menu.addAction(self.new_tab_action)
         file_menu.addAction(self.close_tab_action)
+        file_menu.addAction(self.find_in_tabs_action)
         file_menu.addSeparator()
         file_menu.addAction(self.quit_action)
 
@@ -288,11 +970,12 @@ class EclipseBrowser(QMainWindow):
 
 
     def add_new_tab(self, url=None):
-        profile = QWebEngineProfile(f"Profile-{self.tabs.count()}", self)
+        profile = self.backend.get_profile()
 
         # Передаем self (главное окно) в BrowserTab
         tab = BrowserTab(profile, str(paths.home_page), self, self.tabs)
 
+        self.tab_registry.register(tab)
         i = self.tabs.addTab(tab, "New Tab")
         self.tabs.setCurrentIndex(i)
 
@@ -300,19 +983,28 @@ class EclipseBrowser(QMainWindow):
             tab.browser.setUrl(QUrl(url))
         else:
             tab.navigate_home()
-
-        tab.browser.titleChanged.connect(
-            lambda title, tab_index=i: self.update_tab_title(tab_index, title)
-        )
+        return tab
 
     def close_tab(self, index):
         if self.tabs.count() < 2:
             return
         widget = self.tabs.widget(index)
+        self.tab_registry.unregister(widget.tab_id)
+        self.backend.thumbnails.discard(widget.tab_id)
+        self.backend.tab_index.remove(widget.tab_id)
         widget.deleteLater()
         self.tabs.removeTab(index)
 
+    def on_current_tab_changed(self, index):
+        tab = self.tabs.widget(index)
+        if tab is None:
+            return
+        self.setWindowTitle(f"{tab.title} - EclipseBrowse" if tab.title else "EclipseBrowse")
+        self.statusBar().clearMessage()
+
     def update_tab_title(self, index, title):
+        if index < 0:
+            return
         if title:
             self.tabs.setTabText(index, title[:15] + "..." if len(title) > 15 else title)
         else:
@@ -322,18 +1014,31 @@ class EclipseBrowser(QMainWindow):
         return self.tabs.currentWidget()
 
     def navigate_back(self):
-        self.current_tab().browser.back()
+        if self.current_tab():
+            self.current_tab().browser.back()
 
     def navigate_forward(self):
-        self.current_tab().browser.forward()
+        if self.current_tab():
+            self.current_tab().browser.forward()
 
     def reload_page(self):
-        self.current_tab().browser.reload()
+        if self.current_tab():
+            self.current_tab().browser.reload()
 
     def navigate_home(self):
-        self.current_tab().navigate_home()
+        if self.current_tab():
+            self.current_tab().navigate_home()
+
+    def show_find_in_tabs(self):
+        # Диалог создается при первом вызове
+        if self.find_dialog is None:
+            self.find_dialog = FindInTabsDialog(
+                self.backend.tab_index, self.backend.activate_tab, self)
+        self.find_dialog.show_search()
 
+    # Диалоги нужны редко - импортируем их только при открытии
     def show_settings(self):
+        from PyQt6.QtWidgets import QMessageBox
         QMessageBox.information(
             self,
             "Settings",
@@ -341,6 +1046,7 @@ class EclipseBrowser(QMainWindow):
         )
 
     def show_about(self):
+        from PyQt6.QtWidgets import QMessageBox
         QMessageBox.about(
             self,
             "About EclipseBrowse",
@@ -357,6 +1063,7 @@ class EclipseBrowser(QMainWindow):
                 with open(paths.settings_file, "r") as f:
                     settings = json.load(f)
                     # Применение настроек
+                    self.settings = settings
         except Exception as e:
             logging.error(f"Error loading settings: {e}")
 
@@ -365,7 +1072,9 @@ class EclipseBrowser(QMainWindow):
             settings = {
                 "theme": "dark",
                 "last_session": [],
-                "extensions": []
+                "extensions": [],
+                "lite_mode": self.settings.get("lite_mode", False),
+                "downloads": {**DEFAULT_DOWNLOAD_SETTINGS, **self.settings.get("downloads", {})}
             }
             with open(paths.settings_file, "w") as f:
                 json.dump(settings, f, indent=2)
@@ -374,6 +1083,7 @@ class EclipseBrowser(QMainWindow):
 
     def closeEvent(self, event):
         self.save_settings()
+        self.backend.window_closed(self)
         event.accept()
 
 
@@ -464,6 +1174,13 @@ def setup_search_page():
 
             with open(app_data_search_path, "w", encoding="utf-8") as f:
                 f.write(content)
+
+            # Бенчмарк рендера результатов: http://localhost:8000/search_bench.html
+            bench_path = Path(__file__).parent / "search_bench.html"
+            if bench_path.exists():
+                with open(bench_path, "rb") as src_file, \
+                        open(paths.app_data / "search_bench.html", "wb") as dst_file:
+                    dst_file.write(src_file.read())
         else:
             # Резервная страница
             with open(app_data_search_path, "w", encoding="utf-8") as f:
@@ -479,12 +1196,29 @@ if __name__ == "__main__":
     global paths
     paths = BrowserPaths()
 
-    # Настройка логгирования
-    logging.basicConfig(
-        filename=paths.logs / "browser.log",
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s"
-    )
+    # WebEngine импортируется после создания QApplication, а для этого
+    # Qt требует общий OpenGL-контекст
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv)
+
+    # Если браузер уже запущен - передаем ему URL и выходим, не поднимая
+    # второй сервер и профили
+    urls = [QUrl.fromUserInput(arg, os.getcwd()).toString()
+            for arg in app.arguments()[1:] if not arg.startswith("-")]
+    # Сокет занимаем сразу: процесс, который только передает URL, не
+    # должен ни занимать порт 8000, ни трогать логи работающего экземпляра
+    if forward_to_running_instance(urls):
+        sys.exit(0)
+    instance_server = InstanceServer(app)
+    if not instance_server.listen(urls):
+        sys.exit(0)
+
+    # Настройка логгирования: JSON-записи, запись на диск в отдельном
+    # потоке, ротация browser.log/access.log в paths.logs
+    setup_logging(paths.logs)
+
+    # Кэш превью нужен и окнам, и локальному серверу
+    thumbnail_cache = ThumbnailCache(paths.thumbnails)
 
     # Запуск сервера в отдельном потоке
     server_thread = threading.Thread(target=run_local_server, daemon=True)
@@ -496,8 +1230,6 @@ if __name__ == "__main__":
     # Создание страницы поиска
     paths.search_page = setup_search_page()
 
-    app = QApplication(sys.argv)
-
     app.setStyleSheet("""
         QMainWindow {
             background-color: #1e1e2b;
@@ -528,7 +1260,8 @@ if __name__ == "__main__":
     app_icon_path = str(Path(__file__).parent / "assets" / "EclipseLogo.png")
     app.setWindowIcon(QIcon(app_icon_path))
 
-    browser = EclipseBrowser()
-    browser.show()
+    backend = BrowserBackend(app)
+    instance_server.urls_received.connect(backend.open_urls)
+    backend.open_urls(urls)
 
     sys.exit(app.exec())
\ No newline at end of file
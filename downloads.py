@@ -0,0 +1,357 @@
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from pathlib import Path
+from urllib.parse import urlsplit
+
+CHUNK_SIZE = 64 * 1024
+MIN_SEGMENT_SIZE = 1024 * 1024
+STATE_SAVE_INTERVAL = 1.0
+UPDATE_INTERVAL = 0.25
+USER_AGENT = "EclipseBrowse/1.0"
+
+
+class _RedirectHandler(urllib.request.HTTPRedirectHandler):
+    # Cookie относятся к исходному хосту - на другой хост их не пересылаем
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        request = super().redirect_request(req, fp, code, msg, headers, newurl)
+        if request and urlsplit(newurl).hostname != urlsplit(req.full_url).hostname:
+            request.remove_header("Cookie")
+        return request
+
+
+opener = urllib.request.build_opener(_RedirectHandler)
+
+
+class BandwidthLimiter:
+    """Общий token bucket на все загрузки. rate <= 0 - без ограничения."""
+
+    def __init__(self, bytes_per_second=0):
+        self.rate = bytes_per_second
+        self.allowance = bytes_per_second
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, bytes_per_second):
+        with self.lock:
+            self.rate = bytes_per_second
+            self.allowance = bytes_per_second
+            self.last = time.monotonic()
+
+    def consume(self, amount):
+        with self.lock:
+            if self.rate <= 0:
+                return
+            now = time.monotonic()
+            self.allowance = min(self.rate, self.allowance + (now - self.last) * self.rate)
+            self.last = now
+            self.allowance -= amount
+            wait = -self.allowance / self.rate if self.allowance < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class Download:
+    """Одна загрузка: URL, файл назначения и список сегментов [start, end, done]."""
+
+    def __init__(self, url, dest, download_id=None, referrer=None, mime_type=None):
+        self.id = download_id or uuid.uuid4().hex
+        self.url = url
+        self.dest = Path(dest)
+        # Страница, с которой началась загрузка, и тип, который ожидал WebEngine
+        self.referrer = referrer
+        self.mime_type = mime_type
+        self.size = None
+        self.validator = None
+        self.segments = []
+        self.status = "queued"
+        self.error = None
+        self.stop_event = threading.Event()
+
+    @property
+    def part_file(self):
+        return self.dest.with_name(self.dest.name + ".part")
+
+    @property
+    def downloaded(self):
+        return sum(seg[2] for seg in self.segments)
+
+    @property
+    def progress(self):
+        if not self.size:
+            return 0
+        return int(self.downloaded * 100 / self.size)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "url": self.url,
+            "dest": str(self.dest),
+            "referrer": self.referrer,
+            "mime_type": self.mime_type,
+            "size": self.size,
+            "validator": self.validator,
+            "segments": self.segments,
+            "status": self.status,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        download = cls(data["url"], data["dest"], data["id"],
+                       data.get("referrer"), data.get("mime_type"))
+        download.size = data.get("size")
+        download.validator = data.get("validator")
+        download.segments = [list(seg) for seg in data.get("segments", [])]
+        download.status = data.get("status", "queued")
+        download.error = data.get("error")
+        return download
+
+
+class DownloadManager:
+    """Сегментированные загрузки через HTTP Range с докачкой после перезапуска.
+
+    Файл делится на segments частей, каждая качается своим потоком прямо в
+    нужное смещение .part-файла. Состояние сегментов сохраняется в
+    state_file, незавершенные загрузки продолжаются через resume_pending().
+    Одновременно выполняется не больше max_concurrent загрузок, общая
+    скорость ограничивается bandwidth_limit (байт/с, 0 - без лимита).
+    on_update(download) вызывается из рабочих потоков.
+
+    cookie_header(url) возвращает заголовок Cookie для запроса (тоже из
+    рабочих потоков). Cookie в state_file не пишутся - при докачке
+    заголовок строится заново.
+    """
+
+    def __init__(self, state_file, max_concurrent=3, segments=4,
+                 bandwidth_limit=0, on_update=None, cookie_header=None):
+        self.state_file = Path(state_file)
+        self.segments = max(1, segments)
+        self.limiter = BandwidthLimiter(bandwidth_limit)
+        self.slots = threading.Semaphore(max(1, max_concurrent))
+        self.on_update = on_update
+        self.cookie_header = cookie_header
+        self.downloads = {}
+        self.lock = threading.RLock()
+        self.last_saved = 0.0
+        self.load_state()
+
+    # --- Публичный API ---
+
+    def add(self, url, dest, referrer=None, mime_type=None):
+        download = Download(url, dest, referrer=referrer, mime_type=mime_type)
+        with self.lock:
+            self.downloads[download.id] = download
+        self.save_state(force=True)
+        self.start(download)
+        return download
+
+    def resume_pending(self):
+        with self.lock:
+            pending = [d for d in self.downloads.values()
+                       if d.status in ("queued", "running", "paused")]
+        for download in pending:
+            self.start(download)
+
+    def pause(self, download_id):
+        download = self.downloads.get(download_id)
+        if download and download.status in ("queued", "running"):
+            download.stop_event.set()
+            download.status = "paused"
+            self.save_state(force=True)
+
+    def cancel(self, download_id):
+        download = self.downloads.get(download_id)
+        if not download:
+            return
+        download.stop_event.set()
+        download.status = "cancelled"
+        with self.lock:
+            self.downloads.pop(download_id, None)
+        try:
+            download.part_file.unlink(missing_ok=True)
+        except OSError as e:
+            logging.error(f"Error removing {download.part_file}: {e}")
+        self.save_state(force=True)
+
+    def shutdown(self):
+        # Загрузки останавливаются, но остаются в состоянии "running",
+        # чтобы продолжиться при следующем запуске
+        with self.lock:
+            for download in self.downloads.values():
+                download.stop_event.set()
+        self.save_state(force=True)
+
+    # --- Состояние ---
+
+    def load_state(self):
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    for data in json.load(f):
+                        download = Download.from_dict(data)
+                        self.downloads[download.id] = download
+        except Exception as e:
+            logging.error(f"Error loading download state: {e}")
+
+    def save_state(self, force=False):
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_saved < STATE_SAVE_INTERVAL:
+                return
+            self.last_saved = now
+            data = [d.to_dict() for d in self.downloads.values()
+                    if d.status not in ("finished", "cancelled")]
+            try:
+                tmp_file = self.state_file.with_name(self.state_file.name + ".tmp")
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp_file, self.state_file)
+            except Exception as e:
+                logging.error(f"Error saving download state: {e}")
+
+    # --- Загрузка ---
+
+    def start(self, download):
+        download.stop_event.clear()
+        download.status = "queued"
+        thread = threading.Thread(target=self.run, args=(download,), daemon=True)
+        thread.start()
+
+    def notify(self, download):
+        if self.on_update:
+            try:
+                self.on_update(download)
+            except Exception as e:
+                logging.error(f"Download update callback failed: {e}")
+
+    def run(self, download):
+        with self.slots:
+            if download.stop_event.is_set():
+                return
+            download.status = "running"
+            self.notify(download)
+            try:
+                self.prepare(download)
+                self.fetch_segments(download)
+                if download.stop_event.is_set():
+                    return
+                if download.size is None or download.downloaded >= download.size:
+                    os.replace(download.part_file, download.dest)
+                    download.status = "finished"
+                    logging.info(f"Download finished: {download.url} -> {download.dest}")
+                else:
+                    raise IOError("Connection closed before download completed")
+            except Exception as e:
+                download.status = "failed"
+                download.error = str(e)
+                logging.error(f"Download failed: {download.url}: {e}")
+            finally:
+                self.save_state(force=True)
+                self.notify(download)
+
+    def open_url(self, download, start=None, end=None):
+        request = urllib.request.Request(download.url, headers={"User-Agent": USER_AGENT})
+        if download.referrer:
+            request.add_header("Referer", download.referrer)
+        cookie = self.cookie_header(download.url) if self.cookie_header else None
+        if cookie:
+            request.add_header("Cookie", cookie)
+        if start is not None:
+            range_end = "" if end is None else end
+            request.add_header("Range", f"bytes={start}-{range_end}")
+        return opener.open(request, timeout=30)
+
+    def probe(self, download):
+        # GET с Range: bytes=0-0 дает сразу и размер, и поддержку докачки
+        with self.open_url(download, 0, 0) as response:
+            # Без нужных cookie сервер обычно отдает страницу входа -
+            # ее нельзя сохранять под именем файла
+            if (download.mime_type and download.mime_type != "text/html"
+                    and response.headers.get_content_type() == "text/html"):
+                raise IOError("Server returned an HTML page instead of the file "
+                              "(login required?)")
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            content_range = response.headers.get("Content-Range", "")
+            if response.status == 206 and "/" in content_range:
+                total = content_range.rsplit("/", 1)[1]
+                if total.isdigit():
+                    return int(total), True, validator
+            length = response.headers.get("Content-Length")
+            return (int(length) if length else None), False, validator
+
+    def prepare(self, download):
+        size, ranges, validator = self.probe(download)
+
+        resumable = (ranges and download.segments and download.part_file.exists()
+                     and download.size == size and download.validator == validator)
+        if resumable:
+            logging.info(f"Resuming download {download.url} at {download.downloaded} bytes")
+            return
+
+        download.size = size
+        download.validator = validator
+        if size is None or not ranges:
+            download.segments = [[0, None, 0]]
+        else:
+            count = max(1, min(self.segments, size // MIN_SEGMENT_SIZE))
+            step = size // count
+            download.segments = [
+                [i * step, size - 1 if i == count - 1 else (i + 1) * step - 1, 0]
+                for i in range(count)
+            ]
+
+        download.dest.parent.mkdir(parents=True, exist_ok=True)
+        with open(download.part_file, "wb") as f:
+            if size:
+                f.truncate(size)
+        self.save_state(force=True)
+
+    def fetch_segments(self, download):
+        errors = []
+        threads = []
+        for segment in download.segments:
+            start, end, done = segment
+            if end is not None and start + done > end:
+                continue
+            thread = threading.Thread(
+                target=self.fetch_segment, args=(download, segment, errors), daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def fetch_segment(self, download, segment, errors):
+        start, end, done = segment
+        ranged = end is not None
+        last_update = 0.0
+        try:
+            with self.open_url(download, start + done if ranged else None, end) as response, \
+                    open(download.part_file, "r+b") as f:
+                if ranged and response.status != 206:
+                    raise IOError(f"Server ignored Range request (HTTP {response.status})")
+                f.seek(start + done)
+                while not download.stop_event.is_set():
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    self.limiter.consume(len(chunk))
+                    f.write(chunk)
+                    segment[2] += len(chunk)
+
+                    now = time.monotonic()
+                    if now - last_update >= UPDATE_INTERVAL:
+                        last_update = now
+                        self.save_state()
+                        self.notify(download)
+        except Exception as e:
+            download.stop_event.set()
+            errors.append(e)
+
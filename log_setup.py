@@ -0,0 +1,175 @@
+import atexit
+import itertools
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+ACCESS_LOGGER = "eclipse.access"
+# В access-лог попадает каждый N-й успешный запрос; ошибки пишутся всегда
+ACCESS_SAMPLE_RATE = 10
+
+# Поля из extra=..., которые попадают в JSON-запись
+CONTEXT_FIELDS = ("tab_id", "request_id", "window_id", "url", "method", "path",
+                  "status", "size", "duration_ms", "client", "sampled")
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись: время, уровень, логгер, сообщение, контекст."""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает каждую rate-ю запись уровня INFO и ниже, остальные - все."""
+
+    def __init__(self, rate=ACCESS_SAMPLE_RATE):
+        super().__init__()
+        self.rate = max(1, rate)
+        self.counter = itertools.count()
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or (getattr(record, "status", None) or 0) >= 400:
+            return True
+        if next(self.counter) % self.rate:
+            return False
+        record.sampled = self.rate
+        return True
+
+
+class LoggerNameFilter(logging.Filter):
+    def __init__(self, name, exclude=False):
+        super().__init__()
+        self.prefix = name
+        self.exclude = exclude
+
+    def filter(self, record):
+        return record.name.startswith(self.prefix) != self.exclude
+
+
+class _PreparedQueueHandler(QueueHandler):
+    # Стандартный prepare() форматирует сообщение в потоке вызывающего;
+    # форматирование JSON целиком выполняется в потоке QueueListener
+    def prepare(self, record):
+        return record
+
+
+class _Listener(QueueListener):
+    # stop() вызывается и вручную, и из atexit - второй вызов игнорируем.
+    # Файлы закрываем сразу: открытые дескрипторы не дают удалить каталог
+    # логов в Windows
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+            for handler in self.handlers:
+                handler.close()
+
+
+def setup_logging(log_dir, level=logging.INFO, sample_rate=ACCESS_SAMPLE_RATE):
+    """Асинхронное логгирование через QueueHandler/QueueListener.
+
+    Потоки GUI и сервера только кладут запись в очередь, запись на диск -
+    в отдельном потоке. browser.log и access.log ротируются по размеру.
+    Возвращает QueueListener (останавливается автоматически при выходе).
+    """
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    formatter = JsonFormatter()
+
+    main_handler = RotatingFileHandler(
+        log_dir / "browser.log", maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    main_handler.setFormatter(formatter)
+    main_handler.addFilter(LoggerNameFilter(ACCESS_LOGGER, exclude=True))
+
+    access_handler = RotatingFileHandler(
+        log_dir / "access.log", maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    access_handler.setFormatter(formatter)
+    access_handler.addFilter(LoggerNameFilter(ACCESS_LOGGER))
+
+    log_queue = queue.SimpleQueue()
+    listener = _Listener(log_queue, main_handler, access_handler,
+                         respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_PreparedQueueHandler(log_queue))
+
+    # Сэмплирование до постановки в очередь - отброшенные записи ничего не стоят
+    access = logging.getLogger(ACCESS_LOGGER)
+    for old_filter in access.filters[:]:
+        access.removeFilter(old_filter)
+    access.addFilter(SamplingFilter(sample_rate))
+    return listener
+
+
+request_ids = itertools.count(1)
+
+
+def next_request_id():
+    return next(request_ids)
+
+
+def benchmark(records=20000):
+    """Накладные расходы на запрос в вызывающем потоке, мкс/запись."""
+    import tempfile
+    import time
+
+    def measure(logger):
+        started = time.perf_counter()
+        for i in range(records):
+            logger.info('"GET /home_page.html HTTP/1.1" 200 -', extra={
+                "request_id": i, "method": "GET", "path": "/home_page.html",
+                "status": 200, "client": "127.0.0.1", "duration_ms": 0.4})
+        return (time.perf_counter() - started) * 1e6 / records
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Как было: basicConfig с синхронной записью в один файл
+        root = logging.getLogger()
+        logging.basicConfig(filename=Path(tmp) / "sync.log", level=logging.INFO,
+                            format="%(asctime)s - %(levelname)s - %(message)s", force=True)
+        results["sync file"] = measure(logging.getLogger("bench.sync"))
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+            handler.close()
+
+        for name, rate in (("queue, every request", 1), (f"queue, 1/{ACCESS_SAMPLE_RATE} sampled",
+                                                         ACCESS_SAMPLE_RATE)):
+            listener = setup_logging(Path(tmp) / name.replace(" ", "_").replace("/", "-"),
+                                     sample_rate=rate)
+            results[name] = measure(logging.getLogger(ACCESS_LOGGER))
+            listener.stop()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+
+    for name, value in results.items():
+        print(f"{name:28} {value:7.2f} us/request")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
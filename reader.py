@@ -0,0 +1,419 @@
+import codecs
+import html
+import http.client
+import re
+import threading
+import time
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit, quote
+
+USER_AGENT = "EclipseBrowse/1.0 (Lite)"
+CHUNK_SIZE = 32 * 1024
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+MAX_REDIRECTS = 5
+# <meta charset> по спецификации ищется в первых 1024 байтах
+SNIFF_BYTES = 1024
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w-]+)""", re.I)
+
+# Содержимое этих тегов в lite-режиме не нужно вовсе
+SKIP_TAGS = {
+    "script", "style", "noscript", "template", "iframe", "svg", "canvas",
+    "video", "audio", "object", "embed", "picture", "form", "button",
+    "select", "textarea", "nav", "aside", "footer"
+}
+BLOCK_TAGS = {
+    "h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "pre", "blockquote",
+    "dt", "dd", "td", "th", "figcaption", "caption"
+}
+# Блоки, которые закрываются началом любого другого блока или div
+CONTAINER_TAGS = {"div", "section", "article", "main", "ul", "ol", "table", "tr", "body"}
+MAIN_TAGS = {"main", "article"}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "source", "track", "wbr"
+}
+
+
+class ConnectionPool:
+    """Keep-alive соединения http.client, переиспользуемые между загрузками."""
+
+    def __init__(self, max_per_host=4, timeout=15):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def connect(self, key):
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def acquire(self, key):
+        with self.lock:
+            connections = self.idle.get(key)
+            if connections:
+                return connections.pop(), True
+        return self.connect(key), False
+
+    def release(self, key, connection, response):
+        # Соединение можно вернуть, только если ответ дочитан до конца
+        if response.will_close or not response.isclosed():
+            connection.close()
+            return
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if len(connections) < self.max_per_host:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def request(self, key, path):
+        headers = {
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Encoding": "identity",
+            "Connection": "keep-alive"
+        }
+        connection, reused = self.acquire(key)
+        try:
+            connection.request("GET", path, headers=headers)
+            return connection, connection.getresponse()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            if not reused:
+                raise
+        # Сервер мог закрыть простаивавшее соединение - пробуем новое
+        connection = self.connect(key)
+        connection.request("GET", path, headers=headers)
+        return connection, connection.getresponse()
+
+    @contextmanager
+    def open(self, url):
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https"):
+                raise ValueError(f"Unsupported URL scheme: {parts.scheme}")
+            key = (parts.scheme, parts.hostname, parts.port)
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+            connection, response = self.request(key, path)
+            location = response.getheader("Location")
+            if response.status in (301, 302, 303, 307, 308) and location:
+                response.read()
+                self.release(key, connection, response)
+                url = urljoin(url, location)
+                continue
+
+            try:
+                yield url, response
+            finally:
+                self.release(key, connection, response)
+            return
+        raise IOError(f"Too many redirects: {url}")
+
+
+class ContentExtractor(HTMLParser):
+    """Потоковое извлечение текста: feed() можно вызывать по мере загрузки.
+
+    Собирает блоки (заголовки, абзацы, списки, код) и ссылки, пропуская
+    SKIP_TAGS. Если на странице есть <main> или <article>, в результат
+    попадают только их блоки.
+    """
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.title = ""
+        self.blocks = []
+        self.has_main = False
+
+        self.in_title = False
+        self.skip_stack = []
+        self.main_depth = 0
+        self.pre_depth = 0
+        self.block = None
+        self.link = None
+
+    def start_block(self, tag):
+        self.end_block()
+        self.block = {"tag": tag, "main": self.main_depth > 0, "parts": []}
+
+    def end_block(self):
+        if self.block and any(text.strip() for _, text, _ in self.block["parts"]):
+            self.blocks.append(self.block)
+        self.block = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_stack:
+            if tag in SKIP_TAGS and tag not in VOID_TAGS:
+                self.skip_stack.append(tag)
+            return
+        if tag in SKIP_TAGS:
+            if tag not in VOID_TAGS:
+                self.skip_stack.append(tag)
+            return
+
+        if tag == "title":
+            self.in_title = True
+        elif tag in MAIN_TAGS:
+            self.main_depth += 1
+            self.has_main = True
+        if tag == "pre":
+            self.pre_depth += 1
+
+        if tag in BLOCK_TAGS:
+            if not (self.pre_depth and tag != "pre"):
+                self.start_block(tag)
+        elif tag in CONTAINER_TAGS:
+            self.end_block()
+        elif tag == "br" and self.block:
+            self.block["parts"].append(("text", "\n", None))
+        elif tag == "a":
+            self.link = safe_link(self.base_url, dict(attrs).get("href"))
+        elif tag == "img":
+            alt = dict(attrs).get("alt")
+            if alt:
+                self.add_text(f"[{alt}]")
+
+    def handle_endtag(self, tag):
+        if self.skip_stack:
+            if tag == self.skip_stack[-1]:
+                self.skip_stack.pop()
+            elif tag in ("body", "html"):
+                self.skip_stack.clear()
+            return
+
+        if tag == "title":
+            self.in_title = False
+        elif tag in MAIN_TAGS and self.main_depth:
+            self.main_depth -= 1
+        if tag == "pre" and self.pre_depth:
+            self.pre_depth -= 1
+
+        if tag == "a":
+            self.link = None
+        elif tag in BLOCK_TAGS and not self.pre_depth:
+            self.end_block()
+        elif tag in CONTAINER_TAGS:
+            self.end_block()
+
+    def handle_data(self, data):
+        if self.skip_stack:
+            return
+        if self.in_title:
+            self.title += data
+            return
+        self.add_text(data)
+
+    def add_text(self, text):
+        if not self.pre_depth:
+            text = re.sub(r"\s+", " ", text)
+            if not text.strip() and not (self.block and self.block["parts"]):
+                return
+        if self.block is None:
+            # Текст прямо в div/body - оформляем как абзац
+            self.start_block("p")
+        kind = "link" if self.link else "text"
+        self.block["parts"].append((kind, text, self.link))
+
+    def close(self):
+        super().close()
+        self.end_block()
+
+    def main_blocks(self):
+        if self.has_main:
+            return [block for block in self.blocks if block["main"]]
+        return self.blocks
+
+
+def safe_link(base_url, href):
+    # Lite-страница открывается с localhost: javascript:, data: и прочие
+    # схемы выполнились бы от имени браузера, поэтому ссылкой остаются
+    # только http(s) и якоря внутри страницы, остальное - просто текст
+    if not href:
+        return None
+    href = href.strip()
+    if href.startswith("#"):
+        return href
+    url = urljoin(base_url, href)
+    if urlsplit(url).scheme in ("http", "https"):
+        return url
+    return None
+
+
+def charset_of(response, head=b""):
+    # Сначала заголовок Content-Type, затем <meta charset> или http-equiv
+    # в начале документа (так кодировку объявляют многие cp1251-страницы)
+    names = []
+    match = re.search(r"charset=([\w-]+)", response.getheader("Content-Type", ""), re.I)
+    if match:
+        names.append(match.group(1))
+    match = META_CHARSET_RE.search(head[:SNIFF_BYTES])
+    if match:
+        names.append(match.group(1).decode("ascii"))
+    for name in names:
+        try:
+            codecs.lookup(name)
+            return name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def extract(url, pool):
+    with pool.open(url) as (final_url, response):
+        if response.status >= 400:
+            raise IOError(f"HTTP {response.status} {response.reason}")
+        chunk = response.read(CHUNK_SIZE)
+        decoder = codecs.getincrementaldecoder(charset_of(response, chunk))(errors="replace")
+        extractor = ContentExtractor(final_url)
+        received = 0
+        while chunk:
+            received += len(chunk)
+            extractor.feed(decoder.decode(chunk))
+            if received >= MAX_PAGE_BYTES:
+                # Остаток не читаем - соединение закроется, а не вернется в пул
+                break
+            chunk = response.read(CHUNK_SIZE)
+        extractor.feed(decoder.decode(b"", final=True))
+        extractor.close()
+    return final_url, extractor, received
+
+
+def reader_link(url, reader_path):
+    if url.startswith(("http://", "https://")):
+        return f"{reader_path}?url={quote(url, safe='')}"
+    if url.startswith("#"):
+        return url
+    return None
+
+
+def render_page(source_url, extractor, reader_path="/reader"):
+    title = extractor.title.strip() or source_url
+    body = []
+    for block in extractor.main_blocks():
+        tag = block["tag"]
+        if tag in ("td", "th", "caption"):
+            tag = "p"
+        content = []
+        for kind, text, href in block["parts"]:
+            text = html.escape(text, quote=False)
+            link = reader_link(href, reader_path) if kind == "link" else None
+            if link:
+                content.append(f'<a href="{html.escape(link)}">{text}</a>')
+            else:
+                content.append(text)
+        content = "".join(content)
+        body.append(f"<{tag}>{content if tag == 'pre' else content.strip()}</{tag}>")
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>
+<style>
+  body {{ background: #0d0d1a; color: #e0e0ff; max-width: 760px; margin: 0 auto;
+         padding: 24px; font: 17px/1.6 'Segoe UI', Tahoma, sans-serif; }}
+  a {{ color: #00ffff; }}
+  pre {{ background: rgba(255,255,255,0.07); padding: 12px; overflow-x: auto; }}
+  .source {{ font-size: 0.85rem; color: #8888a0; border-bottom: 1px solid #2a2a3c;
+            padding-bottom: 12px; margin-bottom: 20px; }}
+</style></head><body>
+<div class="source">Lite mode &mdash; <a href="{html.escape(source_url)}">{html.escape(source_url)}</a></div>
+<h1>{html.escape(title)}</h1>
+{chr(10).join(body)}
+</body></html>"""
+
+
+pool = ConnectionPool()
+
+
+def render(url, reader_path="/reader"):
+    final_url, extractor, _ = extract(url, pool)
+    return render_page(final_url, extractor, reader_path)
+
+
+def make_fixture(sections=200):
+    # Документационная страница с "тяжелыми" частями, которые lite-режим пропускает
+    parts = ["<html><head><title>Fixture docs</title>",
+             "<style>" + ".x{color:red}" * 2000 + "</style>",
+             "<script>" + "var a=1;" * 20000 + "</script></head><body>",
+             "<nav>" + "<a href='/n'>nav</a>" * 200 + "</nav><main>"]
+    for i in range(sections):
+        parts.append(f"<h2>Section {i}</h2><p>Paragraph {i} with <a href='/p{i}'>a link</a> "
+                     + "lorem ipsum dolor sit amet " * 20 + "</p>"
+                     f"<pre>def f{i}():\n    return {i}</pre>"
+                     f"<img src='/img{i}.png' alt='figure {i}'>")
+    parts.append("</main><footer>footer</footer></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def renderer_rss_kb():
+    # Память QtWebEngineProcess (Linux): сумма RSS дочерних процессов
+    import os
+    total = 0
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                if int(f.read().rsplit(")", 1)[1].split()[1]) != os.getpid():
+                    continue
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+def compare(url):
+    """Время загрузки и память: lite-режим против обычного QWebEngineView."""
+    import tracemalloc
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    final_url, extractor, received = extract(url, pool)
+    page = render_page(final_url, extractor)
+    lite_ms = (time.perf_counter() - started) * 1000
+    lite_peak = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+    print(f"lite:   {lite_ms:8.1f} ms, peak {lite_peak} KiB Python heap, "
+          f"{received // 1024} KiB in -> {len(page.encode('utf-8')) // 1024} KiB out")
+
+    try:
+        from PyQt6.QtCore import QUrl, QTimer, QCoreApplication, Qt
+        from PyQt6.QtWidgets import QApplication
+        QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+        from PyQt6.QtWebEngineWidgets import QWebEngineView
+    except ImportError as e:
+        print(f"normal: skipped ({e})")
+        return
+
+    app = QApplication.instance() or QApplication([])
+    results = {}
+    for name, target in (("normal", url), ("lite-rendered", None)):
+        view = QWebEngineView()
+        started = time.perf_counter()
+        view.loadFinished.connect(lambda ok, name=name, started=started: (
+            results.__setitem__(name, (time.perf_counter() - started) * 1000),
+            QTimer.singleShot(200, app.quit)))
+        if target:
+            view.setUrl(QUrl(target))
+        else:
+            view.setHtml(page, QUrl(final_url))
+        app.exec()
+        rss = renderer_rss_kb()
+        print(f"{name + ':':14} {results.get(name, float('nan')):8.1f} ms, "
+              f"renderer RSS {rss} KiB")
+        view.deleteLater()
+
+
+if __name__ == "__main__":
+    import sys
+    from stub_server import StubServer
+
+    if len(sys.argv) > 1:
+        compare(sys.argv[1])
+        sys.exit(0)
+
+    server = StubServer(make_fixture(), "text/html; charset=utf-8").start()
+    compare(f"{server.url}/docs.html")
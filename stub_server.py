@@ -0,0 +1,58 @@
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CHUNK_SIZE = 64 * 1024
+
+
+class StubServer(ThreadingHTTPServer):
+    """Локальный HTTP-сервер для тестов и бенчмарков: на любой GET отдает
+    payload, поддерживает Range (206 + Content-Range) и ETag.
+
+    served - список (start, end) отданных диапазонов, в порядке запросов.
+    """
+
+    def __init__(self, payload, content_type="application/octet-stream"):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.payload = payload
+        self.content_type = content_type
+        self.served = []
+        self.url = f"http://127.0.0.1:{self.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        payload = self.server.payload
+        size = len(payload)
+        start, end = 0, size - 1
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else size - 1
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", self.server.content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", '"stub"')
+        self.end_headers()
+        self.server.served.append((start, end))
+        try:
+            for pos in range(start, end + 1, CHUNK_SIZE):
+                self.wfile.write(payload[pos:min(pos + CHUNK_SIZE, end + 1)])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,306 @@
+import itertools
+import logging
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import Qt, QObject, QTimer, pyqtSignal
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QLineEdit, QListWidget,
+                             QListWidgetItem, QLabel)
+
+TOKEN_RE = re.compile(r"\w+")
+SHARDS = 4
+MAX_TEXT_CHARS = 200_000
+MAX_INDEX_CHARS = 8_000_000
+TITLE_WEIGHT = 3
+SNIPPET_CHARS = 80
+MAX_HITS = 50
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class IndexShard:
+    """Часть индекса: токен -> вкладки, плюс текст вкладок для сниппетов.
+
+    Размер ограничен max_chars: при переполнении вытесняются вкладки,
+    которые дольше всего не обновлялись.
+    """
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.docs = OrderedDict()
+        self.postings = {}
+        self.versions = {}
+        self.chars = 0
+        self.lock = threading.Lock()
+
+    def update(self, tab_id, url, title, text, version=0):
+        text = text[:MAX_TEXT_CHARS]
+        # Токенизация - самая дорогая часть, ее делаем без блокировки
+        counts = Counter(tokenize(text))
+        for token in tokenize(title):
+            counts[token] += TITLE_WEIGHT
+
+        with self.lock:
+            # Текст более ранней загрузки мог проиндексироваться позже
+            # нового - такой результат отбрасываем
+            if version < self.versions.get(tab_id, 0):
+                return
+            self.versions[tab_id] = version
+            self.remove_locked(tab_id)
+            self.docs[tab_id] = (url, title, text, counts)
+            for token in counts:
+                self.postings.setdefault(token, set()).add(tab_id)
+            self.chars += len(text)
+            while self.chars > self.max_chars and len(self.docs) > 1:
+                self.remove_locked(next(iter(self.docs)))
+
+    def remove(self, tab_id):
+        with self.lock:
+            self.versions.pop(tab_id, None)
+            self.remove_locked(tab_id)
+
+    def remove_locked(self, tab_id):
+        doc = self.docs.pop(tab_id, None)
+        if doc is None:
+            return
+        for token in doc[3]:
+            tab_ids = self.postings.get(token)
+            if tab_ids is not None:
+                tab_ids.discard(tab_id)
+                if not tab_ids:
+                    del self.postings[token]
+        self.chars -= len(doc[2])
+
+    def search(self, terms):
+        """Совпадения без оценки: (число вкладок, df токенов запроса, матчи).
+
+        idf считается по всему индексу, поэтому оценка - в
+        TabSearchIndex после ответа всех шардов.
+        """
+        with self.lock:
+            # Последнее слово ищем по префиксу - запрос вводится по буквам
+            groups = [[term] for term in terms[:-1]]
+            last = terms[-1]
+            groups.append([token for token in self.postings if token.startswith(last)])
+
+            df = {token: len(self.postings[token])
+                  for group in groups for token in group if token in self.postings}
+
+            candidates = None
+            for group in groups:
+                tab_ids = set()
+                for token in group:
+                    tab_ids |= self.postings.get(token, set())
+                candidates = tab_ids if candidates is None else candidates & tab_ids
+                if not candidates:
+                    return len(self.docs), df, []
+
+            matches = []
+            for tab_id in candidates:
+                url, title, text, counts = self.docs[tab_id]
+                tf = {token: counts[token] for token in df if token in counts}
+                matches.append((tab_id, url, title, text, tf))
+            return len(self.docs), df, matches
+
+
+def rank(matches, total, df, terms):
+    """Оценка совпадений шардов (tf * idf) и MAX_HITS лучших хитов."""
+    scored = []
+    for tab_id, url, title, text, tf in matches:
+        score = sum((1 + math.log(count)) * math.log(1 + total / df[token])
+                    for token, count in tf.items())
+        scored.append((score, tab_id, url, title, text))
+    scored.sort(key=lambda match: match[0], reverse=True)
+
+    return [{
+        "tab_id": tab_id,
+        "score": score,
+        "url": url,
+        "title": title,
+        "snippet": make_snippet(text, terms)
+    } for score, tab_id, url, title, text in scored[:MAX_HITS]]
+
+
+def make_snippet(text, terms):
+    lowered = text.lower()
+    positions = [pos for pos in (lowered.find(term) for term in terms) if pos >= 0]
+    if not positions:
+        return text[:SNIPPET_CHARS].strip()
+    start = max(0, min(positions) - SNIPPET_CHARS // 2)
+    snippet = " ".join(text[start:start + SNIPPET_CHARS].split())
+    return ("..." if start else "") + snippet + "..."
+
+
+class TabSearchIndex(QObject):
+    """Индекс текста вкладок, разбитый на шарды в пуле потоков.
+
+    update() вызывается после загрузки страницы и заменяет прежний текст
+    вкладки. search() раздает запрос всем шардам. Результат каждого шарда
+    сразу приходит сигналом hits_ready(generation, hits, False) с
+    предварительной оценкой по статистике этого шарда; когда ответят все,
+    приходит окончательный список hits_ready(generation, hits, True),
+    оцененный по всему индексу. Устаревшие поколения получатель отбрасывает.
+    """
+
+    hits_ready = pyqtSignal(int, list, bool)
+
+    def __init__(self, shards=SHARDS, max_chars=MAX_INDEX_CHARS, parent=None):
+        super().__init__(parent)
+        self.shards = [IndexShard(max_chars // shards) for _ in range(shards)]
+        self.executor = ThreadPoolExecutor(max_workers=shards, thread_name_prefix="tab-index")
+        self.closed = set()
+        self.generation = 0
+        self.versions = itertools.count(1)
+
+    def shard(self, tab_id):
+        return self.shards[tab_id % len(self.shards)]
+
+    def update(self, tab_id, url, title, text):
+        if tab_id in self.closed:
+            return
+        # Номер фиксируется в GUI-потоке, в порядке навигаций
+        self.executor.submit(self.update_shard, tab_id, url, title, text, next(self.versions))
+
+    def update_shard(self, tab_id, url, title, text, version):
+        try:
+            self.shard(tab_id).update(tab_id, url, title, text, version)
+            # Вкладку могли закрыть, пока текст индексировался
+            if tab_id in self.closed:
+                self.shard(tab_id).remove(tab_id)
+        except Exception as e:
+            logging.error(f"Tab indexing failed: {e}", extra={"tab_id": tab_id})
+
+    def remove(self, tab_id):
+        self.closed.add(tab_id)
+        self.shard(tab_id).remove(tab_id)
+
+    def search(self, query):
+        self.generation += 1
+        generation = self.generation
+        terms = tokenize(query)
+        if terms:
+            futures = [self.executor.submit(shard.search, terms) for shard in self.shards]
+            remaining = [len(futures)]
+            lock = threading.Lock()
+
+            def on_done(future):
+                self.emit_partial(generation, terms, future)
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0]:
+                        return
+                self.emit_hits(generation, terms, futures)
+
+            for future in futures:
+                future.add_done_callback(on_done)
+        return generation
+
+    def emit_partial(self, generation, terms, future):
+        # Рабочий поток шарда - в GUI результаты попадают через сигнал
+        if generation != self.generation or future.cancelled() or future.exception():
+            return
+        total, df, matches = future.result()
+        if matches:
+            self.hits_ready.emit(generation, rank(matches, total, df, terms), False)
+
+    def emit_hits(self, generation, terms, futures):
+        if generation != self.generation:
+            return
+        total = 0
+        df = Counter()
+        matches = []
+        try:
+            for future in futures:
+                shard_total, shard_df, shard_matches = future.result()
+                total += shard_total
+                df.update(shard_df)
+                matches.extend(shard_matches)
+        except Exception as e:
+            logging.error(f"Tab search failed: {e}")
+            return
+        self.hits_ready.emit(generation, rank(matches, total, df, terms), True)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class FindInTabsDialog(QDialog):
+    def __init__(self, index, activate, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.activate = activate
+        self.generation = 0
+        self.hits = []
+
+        self.setWindowTitle("Find in All Tabs")
+        self.resize(640, 420)
+
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Search text of all open tabs...")
+        self.input.setClearButtonEnabled(True)
+        self.results = QListWidget()
+        self.results.setWordWrap(True)
+        self.status = QLabel()
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.input)
+        layout.addWidget(self.results)
+        layout.addWidget(self.status)
+        self.setLayout(layout)
+
+        # Ищем не на каждую букву, а после паузы в наборе
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(150)
+        self.debounce.timeout.connect(self.run_search)
+
+        self.input.textChanged.connect(lambda: self.debounce.start())
+        self.input.returnPressed.connect(self.activate_first)
+        self.results.itemActivated.connect(self.on_item_activated)
+        self.index.hits_ready.connect(self.add_hits)
+
+    def show_search(self):
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.input.setFocus()
+        self.input.selectAll()
+
+    def run_search(self):
+        self.hits = []
+        self.results.clear()
+        self.status.setText("")
+        self.generation = self.index.search(self.input.text())
+
+    def add_hits(self, generation, hits, final):
+        if generation != self.generation:
+            return
+        if final:
+            # Окончательный порядок - по статистике всего индекса
+            self.hits = hits
+        else:
+            self.hits.extend(hits)
+            self.hits.sort(key=lambda hit: hit["score"], reverse=True)
+            del self.hits[MAX_HITS:]
+
+        self.results.clear()
+        for hit in self.hits:
+            item = QListWidgetItem(f"{hit['title'] or hit['url']}\n{hit['snippet']}")
+            item.setToolTip(hit["url"])
+            item.setData(Qt.ItemDataRole.UserRole, hit["tab_id"])
+            self.results.addItem(item)
+        self.status.setText(f"{len(self.hits)} matching tabs")
+
+    def activate_first(self):
+        item = self.results.currentItem() or self.results.item(0)
+        if item:
+            self.on_item_activated(item)
+
+    def on_item_activated(self, item):
+        self.activate(item.data(Qt.ItemDataRole.UserRole), self.input.text())
+        self.hide()
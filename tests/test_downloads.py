@@ -0,0 +1,81 @@
+import random
+import time
+
+import pytest
+
+from downloads import DownloadManager
+from stub_server import StubServer
+
+SIZE = 8 * 1024 * 1024
+RATE = 2 * 1024 * 1024
+PAYLOAD = random.Random(0).randbytes(SIZE)
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = StubServer(PAYLOAD).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def served(server):
+    server.served.clear()
+    return server.served
+
+
+def wait(download, timeout=30):
+    deadline = time.monotonic() + timeout
+    while download.status not in ("finished", "failed"):
+        assert time.monotonic() < deadline, f"timed out at {download.downloaded} bytes"
+        time.sleep(0.05)
+    assert download.status == "finished", download.error
+
+
+def test_segments(server, served, tmp_path):
+    manager = DownloadManager(tmp_path / "state.json", segments=4)
+    download = manager.add(f"{server.url}/file.bin", tmp_path / "file.bin")
+    wait(download)
+
+    assert len(download.segments) == 4
+    # Первый запрос - проба Range: bytes=0-0, дальше по запросу на сегмент
+    assert served[0] == (0, 0)
+    assert sorted(served[1:]) == [(start, end) for start, end, _ in download.segments]
+    assert download.dest.read_bytes() == PAYLOAD
+
+
+def test_resume_after_interrupt(server, served, tmp_path):
+    state_file = tmp_path / "state.json"
+    manager = DownloadManager(state_file, max_concurrent=1, bandwidth_limit=RATE)
+    download = manager.add(f"{server.url}/file.bin", tmp_path / "file.bin")
+    while download.downloaded < SIZE // 4:
+        time.sleep(0.05)
+    # Как при выходе из браузера: загрузка остается в state_file
+    manager.shutdown()
+    assert manager.slots.acquire(timeout=10), "download thread did not stop"
+    interrupted = download.downloaded
+    assert 0 < interrupted < SIZE
+    assert download.part_file.exists()
+
+    served.clear()
+    manager = DownloadManager(state_file)
+    download = next(iter(manager.downloads.values()))
+    assert download.downloaded == interrupted
+    manager.resume_pending()
+    wait(download)
+
+    # Заново запрошены только недостающие байты
+    assert sum(end - start + 1 for start, end in served[1:]) == SIZE - interrupted
+    assert download.dest.read_bytes() == PAYLOAD
+
+
+def test_bandwidth_limit(server, tmp_path):
+    manager = DownloadManager(tmp_path / "state.json", bandwidth_limit=RATE)
+    started = time.monotonic()
+    download = manager.add(f"{server.url}/file.bin", tmp_path / "file.bin")
+    wait(download)
+    elapsed = time.monotonic() - started
+
+    # Первую секунду отдает полный bucket, дальше - не быстрее RATE
+    assert elapsed >= (SIZE - RATE) / RATE * 0.9
+    assert download.dest.read_bytes() == PAYLOAD
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PyQt6 import sip
+from PyQt6.QtCore import Qt, QSize, QBuffer, QIODevice, QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QImageWriter
+
+THUMBNAIL_SIZE = QSize(320, 200)
+CACHE_MAX_BYTES = 20 * 1024 * 1024
+CAPTURE_INTERVAL_MS = 1000
+RECAPTURE_SECONDS = 300
+
+
+class ThumbnailCache:
+    """LRU-кэш превью на диске, ограниченный по суммарному размеру.
+
+    Файлы называются по хешу содержимого, поэтому одинаковые картинки
+    хранятся один раз, а имя файла можно кэшировать в браузере бессрочно.
+    index.json хранит соответствие URL -> файл в порядке использования.
+    """
+
+    def __init__(self, directory, max_bytes=CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.directory / "index.json"
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    for url, entry in json.load(f):
+                        if (self.directory / entry["file"]).exists():
+                            self.entries[url] = entry
+        except Exception as e:
+            logging.error(f"Error loading thumbnail index: {e}")
+
+    def save(self):
+        try:
+            tmp_file = self.index_file.with_name(self.index_file.name + ".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(list(self.entries.items()), f)
+            os.replace(tmp_file, self.index_file)
+        except Exception as e:
+            logging.error(f"Error saving thumbnail index: {e}")
+
+    def get(self, url):
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return None
+            self.entries.move_to_end(url)
+            return self.directory / entry["file"]
+
+    def put(self, url, data, ext):
+        name = f"{hashlib.sha1(data).hexdigest()[:20]}.{ext}"
+        path = self.directory / name
+        with self.lock:
+            if not path.exists():
+                path.write_bytes(data)
+            self.entries[url] = {"file": name, "size": len(data), "time": time.time()}
+            self.entries.move_to_end(url)
+            self.evict()
+            self.save()
+        return path
+
+    def evict(self):
+        sizes = {entry["file"]: entry["size"] for entry in self.entries.values()}
+        total = sum(sizes.values())
+        while total > self.max_bytes and len(self.entries) > 1:
+            _, entry = self.entries.popitem(last=False)
+            if any(e["file"] == entry["file"] for e in self.entries.values()):
+                continue
+            total -= entry["size"]
+            try:
+                (self.directory / entry["file"]).unlink(missing_ok=True)
+            except OSError as e:
+                logging.error(f"Error removing thumbnail {entry['file']}: {e}")
+
+    def snapshot(self):
+        with self.lock:
+            return [(url, entry["file"]) for url, entry in self.entries.items()]
+
+
+def encode_thumbnail(image):
+    # QImage (в отличие от QPixmap) можно обрабатывать вне GUI-потока
+    scaled = image.scaled(THUMBNAIL_SIZE, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                          Qt.TransformationMode.SmoothTransformation)
+    scaled = scaled.copy(0, 0, THUMBNAIL_SIZE.width(), THUMBNAIL_SIZE.height())
+
+    fmt = "webp" if b"webp" in [bytes(f) for f in QImageWriter.supportedImageFormats()] else "png"
+    buffer = QBuffer()
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    scaled.save(buffer, fmt.upper(), 80)
+    return bytes(buffer.data()), fmt
+
+
+class ThumbnailService(QObject):
+    """Снимает превью вкладок после загрузки и пишет их в ThumbnailCache.
+
+    Снимок делается в GUI-потоке не чаще раза в CAPTURE_INTERVAL_MS и
+    только когда ни одна вкладка не грузится (is_busy), масштабирование и
+    кодирование - в отдельном потоке. Фоновые вкладки Chromium не рисует,
+    поэтому они ждут в очереди, пока их не покажут.
+    """
+
+    saved = pyqtSignal(str, str)
+
+    def __init__(self, cache, is_busy, skip_prefixes=(), parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.is_busy = is_busy
+        self.skip_prefixes = tuple(skip_prefixes) + ("about:", "data:")
+        self.pending = OrderedDict()
+        self.recent = {}
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnails")
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(CAPTURE_INTERVAL_MS)
+        self.timer.timeout.connect(self.capture_next)
+
+    def request(self, tab):
+        url = tab.browser.url().toString()
+        if not url or url.startswith(self.skip_prefixes):
+            return
+        if time.monotonic() - self.recent.get(url, -RECAPTURE_SECONDS) < RECAPTURE_SECONDS:
+            return
+        self.pending[tab.tab_id] = tab
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def discard(self, tab_id):
+        self.pending.pop(tab_id, None)
+
+    def capture_next(self):
+        if self.is_busy():
+            return
+        for tab_id, tab in list(self.pending.items()):
+            if sip.isdeleted(tab):
+                del self.pending[tab_id]
+                continue
+            if not tab.browser.isVisible():
+                continue
+
+            del self.pending[tab_id]
+            url = tab.browser.url().toString()
+            self.recent[url] = time.monotonic()
+            image = tab.browser.grab().toImage()
+            future = self.executor.submit(self.store, url, image)
+            future.add_done_callback(self.on_stored)
+            break
+
+        if not self.pending:
+            self.timer.stop()
+
+    def store(self, url, image):
+        data, ext = encode_thumbnail(image)
+        return url, self.cache.put(url, data, ext)
+
+    def on_stored(self, future):
+        # Вызывается в рабочем потоке - в GUI попадаем через сигнал
+        try:
+            url, path = future.result()
+        except Exception as e:
+            logging.error(f"Thumbnail capture failed: {e}")
+            return
+        self.saved.emit(url, str(path))
+
+    def shutdown(self):
+        self.timer.stop()
+        self.executor.shutdown(wait=False)